@@ -3,14 +3,19 @@ YouTube Shorts Automation - Web App v10
 """
 
 import streamlit as st
-import pandas as pd
 import os
+import hashlib
+import importlib
+import random
+import sqlite3
 import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+
+# pandas y googleapiclient se importan bajo demanda (ver ARRANQUE): son lo más
+# lento del arranque en frío y no hacen falta si faltan los Secrets.
 
 st.set_page_config(
     page_title="YouTube Shorts Automation",
@@ -20,7 +25,7 @@ st.set_page_config(
 )
 
 # ============== ESTILOS ==============
-st.markdown("""
+STYLES = """
 <style>
     .main-header {
         display: flex;
@@ -112,7 +117,52 @@ st.markdown("""
         opacity: 0.9;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+def inject_styles():
+    st.markdown(STYLES, unsafe_allow_html=True)
+
+# ============== ARRANQUE ==============
+
+HEAVY_MODULES = ('pandas', 'googleapiclient.discovery', 'googleapiclient.http')
+DISCOVERY_APIS = (('drive', 'v3'), ('sheets', 'v4'))
+
+def is_fast_start():
+    # Modo arranque rápido: SHORTS_FAST_START=1 o [app] fast_start = true en los Secrets
+    flag = os.environ.get('SHORTS_FAST_START')
+    if flag is not None:
+        return flag.strip().lower() in ('1', 'true', 'yes', 'on')
+    try:
+        return bool(st.secrets["app"]["fast_start"])
+    except:
+        return False
+
+@st.cache_resource(show_spinner=False)
+def get_discovery_document(api, version):
+    # JSON del documento de descubrimiento, leído del disco una vez por proceso.
+    # Se guarda como texto: build_from_document modifica el dict que recibe, así
+    # que cada build parsea su propia copia (nada compartido entre hilos)
+    from googleapiclient.discovery_cache import get_static_doc
+    return get_static_doc(api, version)
+
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    # Una vez por proceso, en segundo plano mientras se pinta la primera pantalla:
+    # importa los módulos pesados y deja en caché los documentos de Drive y Sheets
+    def warm():
+        for name in HEAVY_MODULES:
+            try:
+                importlib.import_module(name)
+            except:
+                pass
+        for api, version in DISCOVERY_APIS:
+            try:
+                get_discovery_document(api, version)
+            except:
+                pass
+    thread = threading.Thread(target=warm, name="shorts-warmup", daemon=True)
+    thread.start()
+    return thread
 
 # ============== CONFIGURACIÓN ==============
 
@@ -139,57 +189,88 @@ def get_credentials():
             "client_secret": st.secrets["google"]["client_secret"],
             "scopes": st.secrets["google"]["scopes"]
         }
+        from google.oauth2.credentials import Credentials
         return Credentials.from_authorized_user_info(token_data)
     except:
         return None
 
 # ============== SERVICIOS ==============
 
+def build_service(api, version, credentials):
+    from googleapiclient.discovery import build, build_from_document
+    doc = get_discovery_document(api, version)
+    if doc is None:
+        return build(api, version, credentials=credentials)
+    return build_from_document(doc, credentials=credentials)
+
 def get_drive_service(credentials):
-    return build('drive', 'v3', credentials=credentials)
+    return build_service('drive', 'v3', credentials)
 
 def get_sheets_service(credentials):
-    return build('sheets', 'v4', credentials=credentials)
+    return build_service('sheets', 'v4', credentials)
 
 def list_videos_in_folder(drive_service, folder_id):
     try:
         query = f"'{folder_id}' in parents and mimeType contains 'video/' and trashed = false"
-        results = drive_service.files().list(q=query, fields="files(id, name, createdTime, size)", orderBy="createdTime desc").execute()
+        results = drive_service.files().list(q=query, fields="files(id, name, createdTime, size, md5Checksum, appProperties)", orderBy="createdTime desc").execute()
         return results.get('files', [])
     except:
         return []
 
+# La columna H (sin cabecera) guarda el id de Drive de las filas registradas por la cola
+SHEET_COLUMNS = ['Nombre archivo', 'Título', 'Descripción', 'Estado', 'YouTube URL', 'Fecha subida', 'Fecha publicación', 'Drive ID']
+
 def get_sheet_data(sheets_service, spreadsheet_id, sheet_name):
+    import pandas as pd
     try:
         result = sheets_service.spreadsheets().values().get(
             spreadsheetId=spreadsheet_id,
-            range=f"'{sheet_name}'!A:G"
+            range=f"'{sheet_name}'!A:H"
         ).execute()
         rows = result.get('values', [])
         if len(rows) <= 1:
-            return pd.DataFrame(columns=['Nombre archivo', 'Título', 'Descripción', 'Estado', 'YouTube URL', 'Fecha subida', 'Fecha publicación'])
-        headers = ['Nombre archivo', 'Título', 'Descripción', 'Estado', 'YouTube URL', 'Fecha subida', 'Fecha publicación']
+            return pd.DataFrame(columns=SHEET_COLUMNS)
         data = []
         for row in rows[1:]:
-            while len(row) < 7:
+            while len(row) < len(SHEET_COLUMNS):
                 row.append('')
-            data.append(row[:7])
-        return pd.DataFrame(data, columns=headers)
+            data.append(row[:len(SHEET_COLUMNS)])
+        return pd.DataFrame(data, columns=SHEET_COLUMNS)
     except:
-        return pd.DataFrame(columns=['Nombre archivo', 'Título', 'Descripción', 'Estado', 'YouTube URL', 'Fecha subida', 'Fecha publicación'])
+        return pd.DataFrame(columns=SHEET_COLUMNS)
 
 def add_row_to_sheet(sheets_service, spreadsheet_id, sheet_name, row_data):
+    return add_rows_to_sheet(sheets_service, spreadsheet_id, sheet_name, [row_data])
+
+def add_rows_to_sheet(sheets_service, spreadsheet_id, sheet_name, rows):
     try:
-        if len(row_data) < 6:
-            row_data.append(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-        if len(row_data) < 7:
-            row_data.append('')
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for row_data in rows:
+            if len(row_data) < 6:
+                row_data.append(now)
+            if len(row_data) < 7:
+                row_data.append('')
         sheets_service.spreadsheets().values().append(
             spreadsheetId=spreadsheet_id,
-            range=f"'{sheet_name}'!A:G",
+            range=f"'{sheet_name}'!A:H",
             valueInputOption="RAW",
             insertDataOption="INSERT_ROWS",
-            body={"values": [row_data]}
+            body={"values": rows}
+        ).execute()
+        return True
+    except:
+        return False
+
+def update_sheet_estados(sheets_service, spreadsheet_id, sheet_name, estados):
+    # estados: {número de fila: nuevo estado}, en una sola llamada
+    try:
+        sheets_service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={
+                "valueInputOption": "RAW",
+                "data": [{"range": f"'{sheet_name}'!D{row_num}", "values": [[estado]]}
+                         for row_num, estado in estados.items()],
+            }
         ).execute()
         return True
     except:
@@ -207,30 +288,480 @@ def update_sheet_row(sheets_service, spreadsheet_id, sheet_name, row_num, titulo
     except:
         return False
 
-def upload_video_to_drive(drive_service, folder_id, file, filename, progress_cb=None):
+def upload_file_to_drive(drive_service, folder_id, path, filename, progress_cb=None, app_properties=None):
+    # Subida reanudable desde disco; propaga los errores para que la cola pueda reintentar
+    from googleapiclient.http import MediaFileUpload
+    media = MediaFileUpload(path, resumable=True, chunksize=1024*1024)
+    body = {'name': filename, 'parents': [folder_id]}
+    if app_properties:
+        body['appProperties'] = app_properties
+    request = drive_service.files().create(body=body, media_body=media, fields='id, name, size, md5Checksum')
+    response = None
+    start = time.time()
+    file_size = os.path.getsize(path)
+    while response is None:
+        status, response = request.next_chunk()
+        if status and progress_cb:
+            elapsed = time.time() - start
+            speed = (status.progress() * file_size) / elapsed if elapsed > 0 else 0
+            progress_cb(status.progress(), speed)
+    return response
+
+def find_job_upload(drive_service, folder_id, job_key):
+    # Archivo que ya subió este trabajo (subida completada pero no anotada antes de un corte)
+    query = (f"'{folder_id}' in parents and trashed = false and "
+             f"appProperties has {{ key='jobKey' and value='{job_key}' }}")
+    results = drive_service.files().list(q=query, fields="files(id, name)", pageSize=1).execute()
+    files = results.get('files', [])
+    return files[0] if files else None
+
+def sheet_has_drive_file(sheets_service, spreadsheet_id, sheet_name, drive_file_id):
+    # La columna H guarda el id de Drive de las filas que registra la cola
+    result = sheets_service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id,
+        range=f"'{sheet_name}'!H:H"
+    ).execute()
+    return any(row and row[0] == drive_file_id for row in result.get('values', []))
+
+# ============== LOTES DE DRIVE ==============
+
+DRIVE_BATCH_SIZE = 100  # máximo de llamadas por petición batch en Drive
+DRIVE_BATCH_RETRIES = 4
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def is_retryable_error(exception):
+    status = getattr(getattr(exception, 'resp', None), 'status', None)
+    if status is None:
+        # Sin respuesta HTTP: solo se reintentan los fallos de transporte (red, timeout, TLS);
+        # cualquier otra excepción es un error definitivo
+        import httplib2
+        from google.auth.exceptions import TransportError
+        return isinstance(exception, (OSError, httplib2.HttpLib2Error, TransportError))
+    if int(status) == 403:
+        return 'ratelimitexceeded' in str(exception).lower()
+    return int(status) in RETRYABLE_STATUS
+
+def run_drive_batch(drive_service, operations, callback=None, batch_size=DRIVE_BATCH_SIZE, retries=DRIVE_BATCH_RETRIES):
+    """
+    Ejecuta operaciones de Drive agrupadas con new_batch_http_request.
+    operations: {clave: función que construye el HttpRequest}; se reconstruye en cada reintento.
+    callback(clave, respuesta, error) se llama una vez por operación con su resultado final.
+    Solo se reintentan los elementos fallidos con errores transitorios, en lotes cada vez más pequeños.
+    Devuelve (resultados, errores) como diccionarios por clave.
+    """
+    results, errors = {}, {}
+    pending = list(operations)
+    attempt = 0
+    while pending:
+        failed = {}
+        
+        def on_item(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+                if callback:
+                    callback(request_id, response, None)
+            else:
+                failed[request_id] = exception
+        
+        for i in range(0, len(pending), batch_size):
+            keys = pending[i:i + batch_size]
+            batch = drive_service.new_batch_http_request(callback=on_item)
+            for key in keys:
+                batch.add(operations[key](), request_id=key)
+            try:
+                batch.execute()
+            except Exception as e:
+                for key in keys:
+                    if key not in results and key not in failed:
+                        failed[key] = e
+        
+        attempt += 1
+        pending = [k for k, e in failed.items() if is_retryable_error(e) and attempt <= retries]
+        for key, exception in failed.items():
+            if key not in pending:
+                errors[key] = exception
+                if callback:
+                    callback(key, None, exception)
+        if pending:
+            batch_size = max(1, batch_size // 2)
+            time.sleep(min(2 ** attempt, 16) * (0.5 + random.random() / 2))
+    return results, errors
+
+def get_files_metadata(drive_service, file_ids, fields='id, name, size, md5Checksum, parents, trashed'):
+    results, _ = run_drive_batch(drive_service, {
+        file_id: (lambda file_id=file_id: drive_service.files().get(fileId=file_id, fields=fields))
+        for file_id in file_ids
+    })
+    return results
+
+def move_files(drive_service, file_ids, from_folder, to_folder):
+    results, _ = run_drive_batch(drive_service, {
+        file_id: (lambda file_id=file_id: drive_service.files().update(
+            fileId=file_id, addParents=to_folder, removeParents=from_folder, fields='id'))
+        for file_id in file_ids
+    })
+    return list(results)
+
+# ============== VERIFICACIÓN ==============
+
+PROBE_CHUNK = 64 * 1024
+PROBE_MAX_BOXES = 64
+
+class DriveRangeReader:
+    """Lee un archivo de Drive por rangos HTTP, con un único bloque en memoria"""
+
+    def __init__(self, drive_service, file_id, size, chunk=PROBE_CHUNK):
+        self.drive_service = drive_service
+        self.file_id = file_id
+        self.size = size
+        self.chunk = chunk
+        self.offset = 0
+        self.data = b''
+
+    def read(self, offset, n):
+        if not (self.offset <= offset and offset + n <= self.offset + len(self.data)):
+            end = min(offset + max(n, self.chunk), self.size) - 1
+            request = self.drive_service.files().get_media(fileId=self.file_id)
+            request.headers['Range'] = f'bytes={offset}-{end}'
+            self.data = request.execute()
+            self.offset = offset
+        start = offset - self.offset
+        return self.data[start:start + n]
+
+def probe_mp4(reader):
+    # Recorre las cajas de primer nivel (ftyp, moov, mdat...) leyendo solo sus cabeceras
+    offset, boxes = 0, []
+    while offset < reader.size and len(boxes) < PROBE_MAX_BOXES:
+        header = reader.read(offset, 16)
+        if len(header) < 8:
+            return False, f"Cabecera incompleta en el byte {offset}"
+        box_size = int.from_bytes(header[:4], 'big')
+        box_type = header[4:8].decode('latin-1')
+        if box_size == 1:
+            if len(header) < 16:
+                return False, f"Cabecera incompleta en el byte {offset}"
+            box_size = int.from_bytes(header[8:16], 'big')
+        elif box_size == 0:
+            box_size = reader.size - offset
+        if box_size < 8 or not box_type.isprintable():
+            return False, f"Caja inválida en el byte {offset}"
+        boxes.append(box_type)
+        offset += box_size
+    if offset > reader.size:
+        return False, f"Archivo truncado: faltan {format_size(offset - reader.size)} de '{boxes[-1]}'"
+    if offset < reader.size:
+        return False, "Demasiadas cajas de primer nivel para verificar"
+    if 'moov' not in boxes:
+        return False, "Falta el átomo moov (índice del vídeo)"
+    return True, f"Estructura correcta ({', '.join(boxes)})"
+
+def probe_avi(reader):
+    # Recorre los bloques RIFF (AVI y extensiones AVIX de más de 1 GB)
+    offset, chunks = 0, 0
+    while offset < reader.size and chunks < PROBE_MAX_BOXES:
+        header = reader.read(offset, 12)
+        if len(header) < 12 or header[:4] != b'RIFF':
+            return False, f"Bloque RIFF inválido en el byte {offset}"
+        chunk_size = int.from_bytes(header[4:8], 'little')
+        chunks += 1
+        offset += 8 + chunk_size + (chunk_size & 1)
+    if offset > reader.size:
+        return False, f"Archivo truncado: faltan {format_size(offset - reader.size)}"
+    if offset < reader.size:
+        return False, "Demasiados bloques RIFF para verificar"
+    return True, f"Estructura correcta ({chunks} bloque(s) RIFF)"
+
+def verify_drive_video(drive_service, video):
+    # Devuelve (ok, detalle). Compara con la subida registrada y, si no hay registro, sondea el contenedor
+    size = int(video.get('size', 0) or 0)
+    if size == 0:
+        return False, "Archivo vacío o sin tamaño en Drive"
+    props = video.get('appProperties') or {}
+    if props.get('localSize') or props.get('localMd5'):
+        compared = []
+        if props.get('localSize'):
+            if int(props['localSize']) != size:
+                return False, f"Tamaño en Drive {format_size(size)} ≠ subido {format_size(int(props['localSize']))}"
+            compared.append("tamaño")
+        if props.get('localMd5') and video.get('md5Checksum'):
+            if props['localMd5'] != video['md5Checksum']:
+                return False, "El md5 de Drive no coincide con el de la subida"
+            compared.append("md5")
+        if compared:
+            detail = f"Coincide con la subida ({' y '.join(compared)})"
+            if props.get('localMd5') and 'md5' not in compared:
+                detail += "; Drive aún no tiene md5 para comparar"
+            return True, detail
+    reader = DriveRangeReader(drive_service, video['id'], size)
+    try:
+        if video['name'].lower().endswith('.avi'):
+            return probe_avi(reader)
+        return probe_mp4(reader)
+    except:
+        return False, "No se pudo leer el archivo en Drive"
+
+# ============== COLA DE SUBIDAS ==============
+# Las subidas se guardan en disco + SQLite y las ejecuta un pool de hilos del
+# proceso, no el hilo del script: sobreviven a reruns, a cerrar la pestaña y a
+# cortes del websocket. Cada paso es idempotente (subir → registrar fila).
+
+DATA_DIR = os.environ.get('SHORTS_DATA_DIR', os.path.join(os.getcwd(), '.shorts_data'))
+JOBS_DB = os.path.join(DATA_DIR, 'jobs.db')
+SPOOL_DIR = os.path.join(DATA_DIR, 'spool')
+UPLOAD_WORKERS = int(os.environ.get('SHORTS_UPLOAD_WORKERS', '2'))
+JOB_MAX_ATTEMPTS = 5
+JOB_POLL_SECONDS = 2
+JOBS_REFRESH_SECONDS = 3
+# Cada proceso renueva el heartbeat de sus trabajos 'en curso'; si deja de hacerlo
+# (proceso muerto), otro proceso o el siguiente arranque los devuelve a la cola
+JOB_HEARTBEAT_SECONDS = 15
+JOB_STALE_SECONDS = 120
+SPOOL_ORPHAN_SECONDS = 3600
+
+JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    md5 TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pendiente',
+    progress REAL NOT NULL DEFAULT 0,
+    speed REAL,
+    drive_file_id TEXT,
+    registered INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    heartbeat REAL,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    uploaded_at TEXT,
+    upload_seconds REAL,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+def jobs_db():
+    os.makedirs(DATA_DIR, exist_ok=True)
+    conn = sqlite3.connect(JOBS_DB, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(JOBS_SCHEMA)
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+    if 'heartbeat' not in columns:
+        conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat REAL")
+    return conn
+
+def now_str():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def enqueue_upload_jobs(files):
+    # Copia cada vídeo al spool en bloques (calculando el md5) y crea su trabajo
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    batch = datetime.now().strftime('%Y%m%d%H%M%S') + f"-{random.randrange(16**4):04x}"
+    conn = jobs_db()
+    try:
+        for f in files:
+            f.seek(0)
+            digest = hashlib.md5()
+            fd, path = tempfile.mkstemp(dir=SPOOL_DIR, suffix=os.path.splitext(f.name)[1])
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    for block in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(block)
+                        out.write(block)
+                conn.execute(
+                    "INSERT INTO jobs (batch, filename, path, size, md5, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (batch, f.name, path, os.path.getsize(path), digest.hexdigest(), now_str())
+                )
+            except:
+                # Copia a medias (rerun, desconexión, disco lleno): sin trabajo, no se queda en el spool
+                os.unlink(path)
+                raise
+    finally:
+        conn.close()
+    start_job_workers()['wake'].set()
+    return batch
+
+def claim_job(conn, worker):
+    conn.execute("BEGIN IMMEDIATE")
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as tmp:
-            tmp.write(file.getbuffer())
-            tmp_path = tmp.name
-        media = MediaFileUpload(tmp_path, resumable=True, chunksize=1024*1024)
-        request = drive_service.files().create(
-            body={'name': filename, 'parents': [folder_id]},
-            media_body=media,
-            fields='id, name'
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE status = 'pendiente' AND not_before <= ? ORDER BY id LIMIT 1",
+            (time.time(),)
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'en curso', worker = ?, heartbeat = ?, attempts = attempts + 1, error = NULL WHERE id = ?",
+            (worker, time.time(), row['id'])
         )
-        response = None
-        start = time.time()
-        file_size = os.path.getsize(tmp_path)
-        while response is None:
-            status, response = request.next_chunk()
-            if status and progress_cb:
-                elapsed = time.time() - start
-                speed = (status.progress() * file_size) / elapsed if elapsed > 0 else 0
-                progress_cb(status.progress(), speed)
-        os.unlink(tmp_path)
-        return response
+        conn.execute("COMMIT")
     except:
-        return None
+        conn.execute("ROLLBACK")
+        raise
+    return conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone()
+
+def job_key(job):
+    return f"{job['batch']}-{job['id']}"
+
+def run_upload_job(conn, job, drive_service, sheets_service, config):
+    # Paso 1: subir a Drive (o recuperar la subida de este mismo trabajo si ya se hizo)
+    drive_file_id = job['drive_file_id']
+    if not drive_file_id:
+        existing = find_job_upload(drive_service, config['folder_videos'], job_key(job))
+        if existing:
+            drive_file_id = existing['id']
+            conn.execute("UPDATE jobs SET drive_file_id = ?, progress = 1 WHERE id = ?", (drive_file_id, job['id']))
+        else:
+            last_write = [0.0]
+            
+            def on_progress(p, speed):
+                # Como mucho una escritura por segundo en SQLite
+                if time.time() - last_write[0] >= 1:
+                    last_write[0] = time.time()
+                    conn.execute("UPDATE jobs SET progress = ?, speed = ? WHERE id = ?", (p, speed, job['id']))
+            
+            start = time.time()
+            response = upload_file_to_drive(
+                drive_service, config['folder_videos'], job['path'], job['filename'], on_progress,
+                # Tamaño y md5 locales para verificar la copia de Drive después; jobKey para no duplicarla
+                {'localSize': str(job['size']), 'localMd5': job['md5'], 'jobKey': job_key(job)}
+            )
+            elapsed = time.time() - start
+            drive_file_id = response['id']
+            conn.execute(
+                "UPDATE jobs SET drive_file_id = ?, progress = 1, speed = ?, upload_seconds = ?, uploaded_at = ? WHERE id = ?",
+                (drive_file_id, job['size'] / elapsed if elapsed > 0 else None, elapsed, now_str(), job['id'])
+            )
+    
+    # Paso 2: registrar la fila en el Sheet, marcada con el id de Drive de este trabajo
+    if not job['registered']:
+        if not sheet_has_drive_file(sheets_service, config['spreadsheet_id'], config['sheet_name'], drive_file_id):
+            if not add_row_to_sheet(sheets_service, config['spreadsheet_id'], config['sheet_name'],
+                                    [job['filename'], "", "", "Pendiente de rellenar", "", now_str(), "", drive_file_id]):
+                raise RuntimeError("No se pudo registrar la fila en el Sheet")
+        conn.execute("UPDATE jobs SET registered = 1 WHERE id = ?", (job['id'],))
+    
+    conn.execute("UPDATE jobs SET status = 'hecho', worker = NULL, finished_at = ? WHERE id = ? AND worker = ?",
+                 (now_str(), job['id'], job['worker']))
+    if os.path.exists(job['path']):
+        os.unlink(job['path'])
+
+def job_worker_loop(name, wake):
+    conn = jobs_db()
+    services = None
+    while True:
+        job = None
+        try:
+            job = claim_job(conn, name)
+            if job is None:
+                wake.wait(JOB_POLL_SECONDS)
+                wake.clear()
+                continue
+            config, creds = get_config(), get_credentials()
+            if not config or not creds:
+                raise RuntimeError("Configuración no encontrada")
+            if services is None:
+                services = (get_drive_service(creds), get_sheets_service(creds))
+            run_upload_job(conn, job, services[0], services[1], config)
+        except Exception as e:
+            services = None
+            if job is None:
+                time.sleep(JOB_POLL_SECONDS)
+                continue
+            if job['attempts'] >= JOB_MAX_ATTEMPTS:
+                conn.execute("UPDATE jobs SET status = 'error', worker = NULL, error = ? WHERE id = ? AND worker = ?",
+                             (str(e)[:500], job['id'], job['worker']))
+            else:
+                backoff = min(2 ** job['attempts'] * 5, 300)
+                conn.execute("UPDATE jobs SET status = 'pendiente', worker = NULL, error = ?, not_before = ? "
+                             "WHERE id = ? AND worker = ?",
+                             (str(e)[:500], time.time() + backoff, job['id'], job['worker']))
+
+def requeue_stale_jobs(conn):
+    # Solo los trabajos cuyo proceso dejó de renovar el heartbeat
+    conn.execute("UPDATE jobs SET status = 'pendiente', worker = NULL "
+                 "WHERE status = 'en curso' AND (heartbeat IS NULL OR heartbeat < ?)",
+                 (time.time() - JOB_STALE_SECONDS,))
+
+def remove_orphan_spool_files(conn):
+    # Copias sin trabajo que dejó un proceso muerto a mitad de enqueue_upload_jobs
+    if not os.path.isdir(SPOOL_DIR):
+        return
+    known = {row['path'] for row in conn.execute("SELECT path FROM jobs")}
+    for entry in os.scandir(SPOOL_DIR):
+        if entry.path not in known and entry.stat().st_mtime < time.time() - SPOOL_ORPHAN_SECONDS:
+            os.unlink(entry.path)
+
+def job_heartbeat_loop(boot_id):
+    conn = jobs_db()
+    while True:
+        try:
+            conn.execute("UPDATE jobs SET heartbeat = ? WHERE status = 'en curso' AND worker LIKE ?",
+                         (time.time(), f"{boot_id}:%"))
+            requeue_stale_jobs(conn)
+        except:
+            pass
+        time.sleep(JOB_HEARTBEAT_SECONDS)
+
+@st.cache_resource(show_spinner=False)
+def start_job_workers():
+    # Una vez por recurso cacheado. El boot_id distingue estos hilos de los de otros
+    # procesos (u otra instancia de este recurso) que compartan SHORTS_DATA_DIR
+    boot_id = f"{os.getpid()}-{random.randrange(16**8):08x}"
+    conn = jobs_db()
+    requeue_stale_jobs(conn)
+    try:
+        remove_orphan_spool_files(conn)
+    except:
+        pass
+    conn.close()
+    wake = threading.Event()
+    threads = [threading.Thread(target=job_heartbeat_loop, args=(boot_id,), name="shorts-heartbeat", daemon=True)]
+    for i in range(UPLOAD_WORKERS):
+        threads.append(threading.Thread(target=job_worker_loop, args=(f"{boot_id}:worker-{i}", wake),
+                                        name=f"shorts-upload-{i}", daemon=True))
+    for thread in threads:
+        thread.start()
+    return {'wake': wake, 'threads': threads}
+
+def get_upload_jobs(limit=50):
+    conn = jobs_db()
+    try:
+        return conn.execute(
+            "SELECT * FROM jobs WHERE status IN ('pendiente', 'en curso', 'error') OR finished_at >= ? "
+            "ORDER BY id DESC LIMIT ?",
+            ((datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'), limit)
+        ).fetchall()
+    finally:
+        conn.close()
+
+def retry_upload_job(job_id):
+    conn = jobs_db()
+    try:
+        conn.execute("UPDATE jobs SET status = 'pendiente', attempts = 0, not_before = 0, error = NULL "
+                     "WHERE id = ? AND status = 'error'", (job_id,))
+    finally:
+        conn.close()
+    start_job_workers()['wake'].set()
+
+def discard_upload_job(job_id):
+    # Borra un trabajo fallido y su copia en el spool (lo ya subido a Drive se queda allí)
+    conn = jobs_db()
+    try:
+        job = conn.execute("SELECT path FROM jobs WHERE id = ? AND status = 'error'", (job_id,)).fetchone()
+        if job is None:
+            return
+        conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+    finally:
+        conn.close()
+    if os.path.exists(job['path']):
+        os.unlink(job['path'])
 
 # ============== HELPERS ==============
 
@@ -255,6 +786,33 @@ def format_countdown(seconds):
     secs = seconds % 60
     return f"{mins}:{secs:02d}"
 
+# Orden importante: 'quotaExceeded' cuenta como límite diario, igual que en los logs
+ERROR_CLASSES = [
+    ('limite', "Límite diario de YouTube", ('uploadlimitexceeded', 'exceeded'),
+     "💡 **Solución:** Has alcanzado el límite diario de YouTube. Espera 24 horas."),
+    ('cuota', "Cuota de API", ('quota',),
+     "💡 **Solución:** Cuota de API agotada. Se resetea a medianoche (hora del Pacífico)."),
+    ('token', "Token / autenticación", ('token', 'auth'),
+     "💡 **Solución:** El token ha expirado. Regenera el token y actualiza los Secrets."),
+    ('solicitud', "Solicitud inválida (400)", ('400',),
+     "💡 **Solución:** Error en la solicitud. Verifica el formato del vídeo (MP4 recomendado)."),
+]
+ERROR_OTHER = ('otros', "Otros")
+
+def classify_error(estado):
+    error_lower = estado.lower()
+    for key, label, patterns, tip in ERROR_CLASSES:
+        if any(p in error_lower for p in patterns):
+            return key, label, tip
+    return ERROR_OTHER[0], ERROR_OTHER[1], None
+
+def classify_errors(estados):
+    # Versión vectorizada de classify_error para una Serie: devuelve la etiqueta de cada fila
+    import numpy as np
+    lower = estados.fillna('').str.lower()
+    masks = [lower.str.contains('|'.join(patterns), regex=True) for _, _, patterns, _ in ERROR_CLASSES]
+    return np.select(masks, [label for _, label, _, _ in ERROR_CLASSES], default=ERROR_OTHER[1])
+
 def get_counts(df):
     pendientes = len(df[(df['Título'].str.strip() == '') & (~df['Estado'].str.contains('Subido|Error', case=False, na=False, regex=True))])
     en_cola = len(df[(df['Título'].str.strip() != '') & (~df['Estado'].str.contains('Subido|Error', case=False, na=False, regex=True))])
@@ -262,19 +820,92 @@ def get_counts(df):
     errores = len(df[df['Estado'].str.contains('Error', case=False, na=False)])
     return pendientes, en_cola, subidos, errores
 
+# ============== MÉTRICAS ==============
+
+WAIT_PERCENTILES = [0.5, 0.9, 0.95, 0.99]
+
+def parse_sheet_dates(series):
+    # Fechas del Sheet (de la app o de la Cloud Function) como datetime sin zona; vacías → NaT
+    import pandas as pd
+    dates = pd.to_datetime(series.where(series.str.strip() != ''), errors='coerce', format='mixed', utc=True)
+    return dates.dt.tz_localize(None)
+
+@st.cache_data(show_spinner=False, ttl=300)
+def compute_upload_metrics(df):
+    import pandas as pd
+    fecha_subida = parse_sheet_dates(df['Fecha subida'])
+    fecha_publicacion = parse_sheet_dates(df['Fecha publicación'])
+    subido = df['Estado'].str.contains('Subido', case=False, na=False)
+    error = df['Estado'].str.contains('Error', case=False, na=False)
+    
+    # Espera en cola: de Fecha subida a Fecha publicación, en minutos
+    wait = (fecha_publicacion - fecha_subida)[subido].dt.total_seconds().div(60).dropna()
+    wait = wait[wait >= 0]
+    
+    def count_by(dates, freq):
+        dates = dates.dropna()
+        if dates.empty:
+            return pd.Series(dtype='int64')
+        return pd.Series(1, index=pd.DatetimeIndex(dates)).sort_index().resample(freq).sum()
+    
+    published = fecha_publicacion[subido]
+    per_hour = count_by(published, pd.Timedelta(hours=1))
+    per_day = pd.DataFrame({
+        'Registrados': count_by(fecha_subida, 'D'),
+        'Publicados': count_by(published, 'D'),
+    }).fillna(0).astype(int)
+    
+    processed = int((subido | error).sum())
+    errors_by_class = pd.Series(classify_errors(df.loc[error, 'Estado']), dtype='object').value_counts()
+    
+    return {
+        'wait_percentiles': wait.quantile(WAIT_PERCENTILES) if not wait.empty else pd.Series(dtype='float64'),
+        'wait_count': len(wait),
+        'per_hour': per_hour,
+        'per_day': per_day,
+        'processed': processed,
+        'errors': int(error.sum()),
+        'errors_by_class': pd.DataFrame({
+            'Errores': errors_by_class,
+            'Tasa': errors_by_class / processed if processed else errors_by_class * 0.0,
+        }),
+    }
+
+@st.cache_data(show_spinner=False, ttl=60)
+def compute_upload_speeds():
+    # Velocidad media de cada subida a Drive hecha por la cola (bytes/s); no hay datos de subidas anteriores
+    import pandas as pd
+    conn = jobs_db()
+    try:
+        jobs = pd.read_sql_query(
+            "SELECT uploaded_at, size, speed FROM jobs WHERE upload_seconds IS NOT NULL AND speed IS NOT NULL",
+            conn
+        )
+    finally:
+        conn.close()
+    jobs['uploaded_at'] = pd.to_datetime(jobs['uploaded_at'], errors='coerce')
+    jobs['MB/s'] = jobs['speed'] / 1024**2
+    return jobs.dropna(subset=['uploaded_at'])
+
+def format_minutes(minutes):
+    if minutes < 60: return f"{minutes:.0f} min"
+    if minutes < 60 * 24: return f"{minutes / 60:.1f} h"
+    return f"{minutes / (60 * 24):.1f} d"
+
 # ============== PÁGINAS ==============
 
-def render_upload_tab(drive_service, sheets_service, config):
+def render_upload_tab(config):
     st.markdown("### 📤 Subir vídeos a Drive")
     
     # Si acaba de subir, mostrar solo mensaje de éxito
     if st.session_state.get('just_uploaded', False):
-        st.success("🎉 **¡Vídeos subidos correctamente!**")
-        st.info("👉 Ve a la pestaña **'✏️ Rellenar'** para añadir títulos a tus vídeos.")
+        st.success("🎉 **¡Vídeos en cola de subida!** Se suben en segundo plano: puedes cerrar la pestaña sin perderlos.")
+        st.info("👉 Cuando terminen, ve a la pestaña **'✏️ Rellenar'** para añadir títulos a tus vídeos.")
         
         if st.button("📤 Subir más vídeos", type="primary"):
             st.session_state.just_uploaded = False
             st.rerun()
+        render_upload_jobs()
         return
     
     st.info("💡 **Paso 1:** Sube tus vídeos aquí. Se guardarán en Google Drive automáticamente.")
@@ -286,34 +917,62 @@ def render_upload_tab(drive_service, sheets_service, config):
         st.write(f"📁 **{len(files)} vídeo(s)** seleccionado(s) - {format_size(total_size)} total")
         
         if st.button("🚀 Subir a Drive", type="primary", use_container_width=True):
-            progress = st.progress(0)
-            status_text = st.empty()
-            
-            uploaded_count = 0
-            for i, f in enumerate(files):
-                status_text.write(f"⏳ Subiendo **{f.name}**...")
-                file_progress = st.progress(0)
-                
-                def update(p, speed):
-                    file_progress.progress(p)
-                
-                result = upload_video_to_drive(drive_service, config['folder_videos'], f, f.name, update)
-                
-                if result:
-                    add_row_to_sheet(sheets_service, config['spreadsheet_id'], config['sheet_name'], 
-                                    [f.name, "", "", "Pendiente de rellenar", ""])
-                    uploaded_count += 1
-                
-                file_progress.empty()
-                progress.progress((i + 1) / len(files))
-            
-            status_text.empty()
-            progress.empty()
-            
-            if uploaded_count > 0:
-                st.balloons()
-                st.session_state.just_uploaded = True
-                st.rerun()
+            with st.spinner("Preparando vídeos para la subida..."):
+                enqueue_upload_jobs(files)
+            st.balloons()
+            st.session_state.just_uploaded = True
+            st.rerun()
+    
+    render_upload_jobs()
+
+
+def render_upload_jobs():
+    # El estado sale de la cola persistente, así que se recupera al reconectar
+    jobs = get_upload_jobs()
+    if not jobs:
+        return
+    
+    st.divider()
+    col_title, col_refresh = st.columns([4, 1])
+    with col_title:
+        st.markdown("#### 📦 Subidas en segundo plano")
+    with col_refresh:
+        if st.button("🔄 Actualizar", key="refresh_jobs", use_container_width=True):
+            st.rerun()
+    
+    active = sum(1 for j in jobs if j['status'] in ('pendiente', 'en curso'))
+    if active:
+        refresh = (f"se actualiza cada {JOBS_REFRESH_SECONDS} s" if st_fragment
+                   else "pulsa 🔄 Actualizar para ver el progreso")
+        st.caption(f"⏳ {active} vídeo(s) en proceso ({refresh}). Puedes cerrar la pestaña: la subida continúa en el servidor.")
+    
+    for job in jobs:
+        if job['status'] == 'en curso':
+            speed = f" · {format_size(int(job['speed']))}/s" if job['speed'] else ""
+            st.progress(job['progress'], text=f"⏳ {job['filename']} — {job['progress']:.0%}{speed}")
+        elif job['status'] == 'pendiente':
+            retry = " (reintentando)" if job['attempts'] else ""
+            st.write(f"🕒 {job['filename']} — en espera{retry}")
+        elif job['status'] == 'hecho':
+            st.write(f"✅ {job['filename']} — subido ({format_size(job['size'])})")
+        else:
+            col1, col2, col3 = st.columns([3, 1, 1])
+            with col1:
+                st.write(f"❌ {job['filename']} — {job['error']}")
+            with col2:
+                if st.button("🔁 Reintentar", key=f"retry_job_{job['id']}", use_container_width=True):
+                    retry_upload_job(job['id'])
+                    st.rerun()
+            with col3:
+                if st.button("🗑️ Descartar", key=f"discard_job_{job['id']}", use_container_width=True,
+                             help="Quita el trabajo y borra su copia temporal del servidor"):
+                    discard_upload_job(job['id'])
+                    st.rerun()
+
+# Con st.fragment (Streamlit ≥ 1.33) la lista se refresca sola sin rerun de toda la app
+st_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+if st_fragment:
+    render_upload_jobs = st_fragment(run_every=JOBS_REFRESH_SECONDS)(render_upload_jobs)
 
 
 def render_edit_tab(sheets_service, config, df):
@@ -613,15 +1272,79 @@ def render_logs_tab(df):
                 st.code(row['Estado'])
                 
                 # Sugerencias según el error
-                error_lower = row['Estado'].lower()
-                if 'uploadlimitexceeded' in error_lower or 'exceeded' in error_lower:
-                    st.info("💡 **Solución:** Has alcanzado el límite diario de YouTube. Espera 24 horas.")
-                elif 'quota' in error_lower:
-                    st.info("💡 **Solución:** Cuota de API agotada. Se resetea a medianoche (hora del Pacífico).")
-                elif 'token' in error_lower or 'auth' in error_lower:
-                    st.info("💡 **Solución:** El token ha expirado. Regenera el token y actualiza los Secrets.")
-                elif '400' in error_lower:
-                    st.info("💡 **Solución:** Error en la solicitud. Verifica el formato del vídeo (MP4 recomendado).")
+                _, _, tip = classify_error(row['Estado'])
+                if tip:
+                    st.info(tip)
+
+
+def render_metrics_tab(df, on_demand=False):
+    st.markdown("### 📈 Métricas de subida")
+    
+    # Con st.tabs esta pestaña se ejecuta en cada rerun aunque no se vea: los gráficos
+    # (altair) y la lectura de la cola solo se cargan si se piden
+    if on_demand and not st.toggle("Mostrar métricas", key="show_metrics"):
+        st.caption("Activa **Mostrar métricas** para calcular los gráficos.")
+        return
+    
+    metrics = compute_upload_metrics(df)
+    
+    # Espera en cola
+    st.markdown("#### ⏱️ Tiempo en cola")
+    if metrics['wait_count'] == 0:
+        st.info("📭 Aún no hay vídeos publicados con fecha de subida y de publicación.")
+    else:
+        st.caption(f"De 'Fecha subida' a 'Fecha publicación' · {metrics['wait_count']} vídeo(s)")
+        for col, (q, minutes) in zip(st.columns(len(WAIT_PERCENTILES)), metrics['wait_percentiles'].items()):
+            col.metric(f"p{q * 100:g}", format_minutes(minutes))
+    
+    st.divider()
+    
+    # Ritmo
+    st.markdown("#### 📅 Ritmo de subidas")
+    per_day = metrics['per_day']
+    if per_day.empty:
+        st.info("📭 Sin datos de fechas todavía.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("📊 Publicados / día (media)", f"{per_day['Publicados'].mean():.1f}")
+        col2.metric("🔝 Máximo en un día", int(per_day['Publicados'].max()))
+        col3.metric("📥 Registrados / día (media)", f"{per_day['Registrados'].mean():.1f}")
+        st.bar_chart(per_day)
+        
+        per_hour = metrics['per_hour']
+        if not per_hour.empty:
+            st.caption("Publicados por hora (últimos 7 días)")
+            st.line_chart(per_hour[per_hour.index >= per_hour.index.max() - timedelta(days=7)])
+    
+    st.divider()
+    
+    # Errores
+    st.markdown("#### ❌ Errores por tipo")
+    if metrics['errors'] == 0:
+        st.success("✅ **Sin errores**")
+    else:
+        st.metric("Tasa de error", f"{metrics['errors'] / metrics['processed']:.1%}",
+                  help="Errores sobre vídeos procesados (subidos + con error)")
+        errors_by_class = metrics['errors_by_class']
+        st.bar_chart(errors_by_class['Errores'])
+        st.dataframe(errors_by_class.assign(Tasa=errors_by_class['Tasa'].map('{:.1%}'.format)), use_container_width=True)
+    
+    st.divider()
+    
+    # Velocidad de Drive
+    st.markdown("#### 🚀 Velocidad de subida a Drive")
+    st.caption("Solo subidas hechas con la cola de **📤 Subir** (una velocidad media por vídeo). "
+               "Las subidas anteriores a la cola o hechas directamente en Drive no aparecen.")
+    speeds = compute_upload_speeds()
+    if speeds.empty:
+        st.info("📭 Aún no hay subidas registradas por la cola.")
+    else:
+        mbps = speeds['MB/s']
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Mediana", f"{mbps.median():.1f} MB/s")
+        col2.metric("p10 (lentas)", f"{mbps.quantile(0.1):.1f} MB/s")
+        col3.metric("Volumen subido", format_size(int(speeds['size'].sum())))
+        st.line_chart(speeds.set_index('uploaded_at')['MB/s'].resample('D').median().dropna())
 
 
 def render_drive_tab(drive_service, sheets_service, config, df, videos_drive):
@@ -637,9 +1360,10 @@ def render_drive_tab(drive_service, sheets_service, config, df, videos_drive):
         st.warning(f"⚠️ **{len(unregistered)} vídeo(s)** en Drive sin registrar en el sistema")
         
         if st.button("➕ Añadir todos al sistema", type="primary", use_container_width=True):
-            for v in unregistered:
-                add_row_to_sheet(sheets_service, config['spreadsheet_id'], config['sheet_name'],
-                                [v['name'], "", "", "Pendiente de rellenar", ""])
+            if not add_rows_to_sheet(sheets_service, config['spreadsheet_id'], config['sheet_name'],
+                                     [[v['name'], "", "", "Pendiente de rellenar", ""] for v in unregistered]):
+                st.error("❌ Error al añadir los vídeos")
+                return
             st.success(f"✅ {len(unregistered)} vídeos añadidos. Ve a 'Rellenar datos' para completar la información.")
             time.sleep(1)
             st.rerun()
@@ -671,8 +1395,106 @@ def render_drive_tab(drive_service, sheets_service, config, df, videos_drive):
         st.success(f"📁 **/procesados/**\n\nVídeos ya subidos a YouTube")
     with col3:
         st.error(f"📁 **/errores/**\n\nVídeos que fallaron")
+    
+    # Vídeos que siguen en /videos/ aunque su fila ya está subida o con error.
+    # Se emparejan por el id de Drive de la fila; por nombre solo si hay una única fila
+    # con ese nombre y no pertenece a otro archivo
+    estados_por_id = dict(zip(df['Drive ID'], df['Estado']))
+    estados_por_id.pop('', None)
+    names = df['Nombre archivo'].str.lower()
+    unique_names = df[~names.duplicated(keep=False)]
+    estados_por_nombre = {name: (drive_id, estado) for name, drive_id, estado in
+                          zip(unique_names['Nombre archivo'].str.lower(), unique_names['Drive ID'], unique_names['Estado'])}
+    stale = {'procesados': [], 'errores': []}
+    for v in videos_drive:
+        if v['id'] in estados_por_id:
+            estado = estados_por_id[v['id']].lower()
+        else:
+            drive_id, estado = estados_por_nombre.get(v['name'].lower(), ('', ''))
+            estado = estado.lower() if drive_id in ('', v['id']) else ''
+        if 'subido' in estado:
+            stale['procesados'].append(v['id'])
+        elif 'error' in estado:
+            stale['errores'].append(v['id'])
+    
+    if stale['procesados'] or stale['errores']:
+        st.warning(f"🧹 En /videos/ hay {len(stale['procesados'])} vídeo(s) ya subido(s) y "
+                   f"{len(stale['errores'])} con error que deberían estar en su carpeta.")
+        if st.button("🧹 Ordenar carpetas", key="tidy_folders", use_container_width=True):
+            moved = 0
+            for folder, ids in stale.items():
+                moved += len(move_files(drive_service, ids, config['folder_videos'], config[f'folder_{folder}']))
+            total = len(stale['procesados']) + len(stale['errores'])
+            st.toast(f"🧹 {moved} de {total} vídeo(s) movido(s)")
+            time.sleep(0.3)
+            st.rerun()
+    
+    st.divider()
+    render_verify_section(drive_service, sheets_service, config, df, videos_drive)
 
 
+def render_verify_section(drive_service, sheets_service, config, df, videos_drive):
+    st.markdown("#### 🩺 Verificar vídeos con error")
+    
+    error_df = df[df['Estado'].str.contains('Error', case=False, na=False)]
+    error_names = set(error_df['Nombre archivo'].str.lower())
+    
+    st.caption("Comprueba que la copia de Drive (en /errores/ o /videos/) está completa, comparando tamaño y md5 "
+               "con la subida registrada o leyendo solo las cabeceras del vídeo.")
+    
+    if st.button("🔍 Verificar", key="verify_drive", use_container_width=True):
+        candidates = [dict(v, folder='errores') for v in list_videos_in_folder(drive_service, config['folder_errores'])]
+        candidates += [dict(v, folder='videos') for v in videos_drive if v['name'].lower() in error_names]
+        results = []
+        progress = st.progress(0)
+        for i, v in enumerate(candidates):
+            ok, detail = verify_drive_video(drive_service, v)
+            results.append({'id': v['id'], 'name': v['name'], 'folder': v['folder'], 'ok': ok, 'detail': detail})
+            progress.progress((i + 1) / len(candidates))
+        progress.empty()
+        st.session_state.verify_results = results
+    
+    results = st.session_state.get('verify_results')
+    if results is None:
+        return
+    if not results:
+        st.success("✅ No hay vídeos con error en Drive")
+        return
+    
+    for r in results:
+        icon = "✅" if r['ok'] else "❌"
+        st.write(f"{icon} **{r['name']}** · /{r['folder']}/ — {r['detail']}")
+    
+    verified = [r for r in results if r['ok']]
+    if not verified:
+        st.warning("⚠️ Ningún vídeo se puede reencolar: revisa o vuelve a subir los archivos dañados.")
+        return
+    
+    if st.button(f"♻️ Reencolar {len(verified)} vídeo(s) verificado(s)", type="primary", use_container_width=True):
+        # Solo los que siguen en /errores/ (el resultado de la verificación puede ser antiguo)
+        current = get_files_metadata(drive_service, [r['id'] for r in verified if r['folder'] == 'errores'],
+                                     fields='id, parents, trashed')
+        to_move = [file_id for file_id, meta in current.items()
+                   if config['folder_errores'] in meta.get('parents', []) and not meta.get('trashed')]
+        moved = set(move_files(drive_service, to_move, config['folder_errores'], config['folder_videos']))
+        requeued = {r['name'].lower() for r in verified if r['folder'] == 'videos' or r['id'] in moved}
+        
+        # Las filas vuelven a la cola (con título) o a rellenar (sin título), como cualquier fila nueva
+        estados = {idx + 2: "Pendiente de rellenar" for idx, row in error_df.iterrows()
+                   if row['Nombre archivo'].lower() in requeued}
+        if estados and not update_sheet_estados(sheets_service, config['spreadsheet_id'], config['sheet_name'], estados):
+            st.error("❌ Vídeos movidos, pero no se pudo actualizar el Sheet")
+            return
+        
+        failed = len(to_move) - len(moved)
+        st.session_state.verify_results = None
+        st.toast(f"♻️ {len(requeued)} vídeo(s) reencolado(s)" + (f", {failed} no se pudieron mover" if failed else ""))
+        time.sleep(0.3)
+        st.rerun()
+
+
+TAB_KEYS = ['subir', 'rellenar', 'cola', 'historial', 'logs', 'metricas', 'drive']
+
 def main():
     config = get_config()
     creds = get_credentials()
@@ -682,13 +1504,24 @@ def main():
         st.info("Necesitas configurar las credenciales de Google en los Secrets de la aplicación.")
         return
     
+    start_warmup()
+    inject_styles()
+    start_job_workers()
+    fast_start = is_fast_start()
+    active_tab = st.session_state.get('active_tab', 'subir')
+    
     # Servicios
     drive = get_drive_service(creds)
     sheets = get_sheets_service(creds)
     
-    # Datos
-    df = get_sheet_data(sheets, config['spreadsheet_id'], config['sheet_name'])
-    videos_drive = list_videos_in_folder(drive, config['folder_videos'])
+    # Datos: el listado de Drive se pide en paralelo con el Sheet
+    # (en modo rápido solo si la pestaña activa es Drive)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        videos_future = None
+        if not fast_start or active_tab == 'drive':
+            videos_future = pool.submit(list_videos_in_folder, drive, config['folder_videos'])
+        df = get_sheet_data(sheets, config['spreadsheet_id'], config['sheet_name'])
+        videos_drive = videos_future.result() if videos_future else []
     
     # Contadores
     pendientes, en_cola, subidos, errores = get_counts(df)
@@ -719,32 +1552,35 @@ def main():
         st.session_state.last_subidos_count = subidos
     
     # Tabs
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "📤 Subir",
-        f"✏️ Rellenar ({pendientes})" if pendientes > 0 else "✏️ Rellenar",
-        f"🚀 En cola ({en_cola})" if en_cola > 0 else "🚀 En cola",
-        f"📊 Historial ({subidos})" if subidos > 0 else "📊 Historial",
-        f"📋 Logs ({errores})" if errores > 0 else "📋 Logs",
-        "📁 Drive"
-    ])
-    
-    with tab1:
-        render_upload_tab(drive, sheets, config)
-    
-    with tab2:
-        render_edit_tab(sheets, config, df)
-    
-    with tab3:
-        render_queue_tab(df)
-    
-    with tab4:
-        render_history_tab(df)
+    labels = {
+        'subir': "📤 Subir",
+        'rellenar': f"✏️ Rellenar ({pendientes})" if pendientes > 0 else "✏️ Rellenar",
+        'cola': f"🚀 En cola ({en_cola})" if en_cola > 0 else "🚀 En cola",
+        'historial': f"📊 Historial ({subidos})" if subidos > 0 else "📊 Historial",
+        'logs': f"📋 Logs ({errores})" if errores > 0 else "📋 Logs",
+        'metricas': "📈 Métricas",
+        'drive': "📁 Drive",
+    }
+    renderers = {
+        'subir': lambda: render_upload_tab(config),
+        'rellenar': lambda: render_edit_tab(sheets, config, df),
+        'cola': lambda: render_queue_tab(df),
+        'historial': lambda: render_history_tab(df),
+        'logs': lambda: render_logs_tab(df),
+        'metricas': lambda: render_metrics_tab(df, on_demand=not fast_start),
+        'drive': lambda: render_drive_tab(drive, sheets, config, df, videos_drive),
+    }
     
-    with tab5:
-        render_logs_tab(df)
+    if fast_start:
+        # st.tabs ejecuta todas las pestañas en cada rerun; aquí solo la activa
+        active_tab = st.radio("Sección", TAB_KEYS, format_func=lambda k: labels[k],
+                              horizontal=True, key="active_tab", label_visibility="collapsed")
+        renderers[active_tab]()
+        return
     
-    with tab6:
-        render_drive_tab(drive, sheets, config, df, videos_drive)
+    for key, tab in zip(TAB_KEYS, st.tabs([labels[k] for k in TAB_KEYS])):
+        with tab:
+            renderers[key]()
 
 
 if __name__ == "__main__":
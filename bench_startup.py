@@ -0,0 +1,155 @@
+"""
+Benchmark de arranque en frío de app.py
+
+Cada medición es un proceso Python nuevo que ejecuta la app una vez con
+streamlit.testing, como un arranque tras dormir. Dos escenarios:
+
+  sin-secrets   sin configuración: solo la pantalla "Configuración no encontrada"
+  configurado   Secrets falsos y googleapiclient.discovery sustituido por un
+                servicio falso (sin red) con un Sheet de --rows filas; se mide
+                con SHORTS_FAST_START=0 (todas las pestañas) y =1 (solo la activa)
+
+    python bench_startup.py                       # app.py actual
+    python bench_startup.py --baseline old_app.py # comparar con otra versión
+
+Para comparar con la versión anterior al modo de arranque rápido, usa el padre
+del commit que añadió este script:
+
+    git show "$(git log --diff-filter=A --format=%H -- bench_startup.py)~1:app.py" > /tmp/old_app.py
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import importlib.abc, importlib.machinery, sys, time
+
+script, scenario, rows = sys.argv[1], sys.argv[2], int(sys.argv[3])
+
+SHEET = [['Nombre archivo', 'Título', 'Descripción', 'Estado', 'YouTube URL', 'Fecha subida', 'Fecha publicación']]
+for i in range(rows):
+    estado = ('Subido', 'Error: quotaExceeded', 'Pendiente de rellenar', 'Pendiente de rellenar')[i % 4]
+    titulo = '' if i % 4 == 3 else f'Short {i}'
+    publicado = f'2024-01-{i % 28 + 1:02d} {i % 24:02d}:30:00' if estado == 'Subido' else ''
+    SHEET.append([f'video_{i}.mp4', titulo, '', estado, '', f'2024-01-{i % 28 + 1:02d} {i % 24:02d}:00:00', publicado])
+
+class FakeService:
+    # Cualquier cadena de llamadas (files().list(...), spreadsheets().values().get(...)) acaba en execute()
+    def __init__(self, path=()):
+        self.path = path
+    def __getattr__(self, name):
+        return FakeService(self.path + (name,))
+    def __call__(self, *args, **kwargs):
+        return self
+    def execute(self):
+        if 'values' in self.path and 'get' in self.path:
+            return {'values': [list(r) for r in SHEET]}
+        return {'files': []}
+
+class StubDiscovery(importlib.abc.MetaPathFinder):
+    # Carga el googleapiclient.discovery real (su coste de importación cuenta) y cambia build()
+    def find_spec(self, name, path, target=None):
+        if name != 'googleapiclient.discovery':
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(name, path)
+        exec_module = spec.loader.exec_module
+        def patched(module):
+            exec_module(module)
+            module.build = module.build_from_document = lambda *a, **k: FakeService()
+        spec.loader.exec_module = patched
+        return spec
+
+if scenario == 'configurado':
+    sys.meta_path.insert(0, StubDiscovery())
+
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file(script, default_timeout=60)
+if scenario == 'configurado':
+    at.secrets['google'] = {
+        'folder_videos': 'videos', 'folder_procesados': 'procesados', 'folder_errores': 'errores',
+        'spreadsheet_id': 'sheet', 'sheet_name': 'Hoja 1', 'notification_email': 'bench@example.com',
+        'token': 'x', 'refresh_token': 'x', 'token_uri': 'https://oauth2.googleapis.com/token',
+        'client_id': 'x', 'client_secret': 'x', 'scopes': ['https://www.googleapis.com/auth/drive'],
+    }
+at.run()
+t2 = time.perf_counter()
+if at.exception:
+    print('ERROR', at.exception[0].message.replace(' ', '_'))
+    sys.exit(0)
+heavy = [m for m in ('pandas', 'googleapiclient.discovery', 'googleapiclient.http') if m in sys.modules]
+print(f"{t1 - t0:.4f} {t2 - t1:.4f} {','.join(heavy) or '-'}")
+"""
+
+HEAVY = r"""
+import time
+t0 = time.perf_counter()
+import pandas, googleapiclient.discovery, googleapiclient.http
+print(f"{time.perf_counter() - t0:.4f}")
+"""
+
+def run_probe(script, scenario, rows, env):
+    out = subprocess.run([sys.executable, "-c", PROBE, script, scenario, str(rows)], env=env,
+                         capture_output=True, text=True, check=True).stdout
+    fields = out.strip().splitlines()[-1].split(" ")
+    if fields[0] == "ERROR":
+        raise SystemExit(f"{script} ({scenario}) falló: {fields[1].replace('_', ' ')}")
+    return float(fields[0]), float(fields[1]), fields[2]
+
+def bench(script, scenario, runs, rows, env):
+    results = [run_probe(script, scenario, rows, env) for _ in range(runs)]
+    run_times = [r[1] for r in results]
+    return {
+        'median': statistics.median(run_times),
+        'min': min(run_times),
+        'heavy': results[-1][2],
+    }
+
+def report(name, r, baseline=None):
+    saved = ""
+    if baseline:
+        diff = baseline['median'] - r['median']
+        saved = f"  ahorro {diff * 1000:+.1f} ms ({diff / baseline['median']:+.0%})"
+    print(f"  {name:<22} mediana {r['median'] * 1000:7.1f} ms  (mín {r['min'] * 1000:.1f} ms){saved}"
+          f"  módulos pesados: {r['heavy']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"))
+    parser.add_argument("--baseline", help="otra versión de app.py para comparar")
+    parser.add_argument("--scenario", choices=["sin-secrets", "configurado", "todos"], default="todos")
+    parser.add_argument("--rows", type=int, default=500, help="filas del Sheet falso (escenario configurado)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="shorts-bench-")
+    env = dict(os.environ, STREAMLIT_BROWSER_GATHER_USAGE_STATS="false", SHORTS_DATA_DIR=data_dir)
+
+    heavy = statistics.median(
+        float(subprocess.run([sys.executable, "-c", HEAVY], env=env, capture_output=True,
+                             text=True, check=True).stdout.strip())
+        for _ in range(args.runs)
+    )
+    print(f"Importar pandas + googleapiclient en frío: {heavy * 1000:.1f} ms")
+
+    scenarios = ["sin-secrets", "configurado"] if args.scenario == "todos" else [args.scenario]
+    for scenario in scenarios:
+        print(f"\n{scenario}:")
+        baseline = None
+        if args.baseline:
+            baseline = bench(args.baseline, scenario, args.runs, args.rows, dict(env, SHORTS_FAST_START="0"))
+            report("baseline", baseline)
+        if scenario == "sin-secrets":
+            report("actual", bench(args.app, scenario, args.runs, args.rows, env), baseline)
+            continue
+        for fast in ("0", "1"):
+            result = bench(args.app, scenario, args.runs, args.rows, dict(env, SHORTS_FAST_START=fast))
+            report(f"actual (FAST_START={fast})", result, baseline)
+
+if __name__ == "__main__":
+    main()